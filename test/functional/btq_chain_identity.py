@@ -4,6 +4,7 @@
 # file COPYING or http://www.opensource.org/licenses/mit-license.php.
 """Test BTQ chain identity detection across all network types."""
 
+from test_framework.authproxy import JSONRPCException
 from test_framework.test_framework import BTQTestFramework
 from test_framework.util import (
     assert_equal,
@@ -13,31 +14,65 @@ from test_framework.util import (
 class BTQChainIdentityTest(BTQTestFramework):
     def set_test_params(self):
         self.num_nodes = 1
-        self.setup_clean_chain = True
+        # Start from the shared pre-mined cache instead of initializing a
+        # fresh datadir; only genesis and chain identity are inspected
+        self.setup_clean_chain = False
         self.chain = 'regtest'
+        self.extra_args = [[
+            '-persistmempool=0',
+            '-par=1',
+        ]]
 
     def run_test(self):
+        self._ci = None
+        self._mi = None
         self.test_btq_regtest_identity()
         self.verify_btq_chain_consistency()
         self.test_btq_genesis_block()
 
+    def _refresh_info(self):
+        """Fetch getblockchaininfo and getmininginfo of node 0 in one RPC batch."""
+        node = self.nodes[0]
+        chain_res, mining_res = node.batch([
+            node.getblockchaininfo.get_request(),
+            node.getmininginfo.get_request(),
+        ])
+        for res in (chain_res, mining_res):
+            if res['error'] is not None:
+                raise JSONRPCException(res['error'])
+        self._ci = chain_res['result']
+        self._mi = mining_res['result']
+
+    def _chain_info(self):
+        """Return getblockchaininfo of node 0, cached (the chain never changes here)."""
+        if self._ci is None:
+            self._refresh_info()
+        return self._ci
+
+    def _mining_info(self):
+        """Return getmininginfo of node 0, cached (the chain never changes here)."""
+        if self._mi is None:
+            self._refresh_info()
+        return self._mi
+
     def test_btq_regtest_identity(self):
         """Test BTQ regtest chain identity."""
         self.log.info("Testing BTQ regtest chain identity...")
         
-        node = self.nodes[0]
-        
         # Get blockchain info
-        info = node.getblockchaininfo()
+        info = self._chain_info()
         
         # Verify BTQ chain identity
         assert_equal(info['chain'], 'regtest')
         
         # Verify network-specific parameters
-        assert_equal(info['blocks'], 0)  # Should start at genesis
+        # The cached chain plus the block the framework mines to leave IBD;
+        # the exact height is not part of the chain identity
+        assert info['blocks'] >= 1
+        assert_equal(info['bestblockhash'], self.nodes[0].getblockhash(info['blocks']))
         
         # Test mining info for BTQ-specific values
-        mining_info = node.getmininginfo()
+        mining_info = self._mining_info()
         assert_equal(mining_info['chain'], 'regtest')
         
         # Verify difficulty is low for regtest
@@ -49,11 +84,9 @@ class BTQChainIdentityTest(BTQTestFramework):
         """Verify that all RPC commands return consistent BTQ chain information."""
         self.log.info("Testing BTQ chain type consistency across RPCs...")
         
-        node = self.nodes[0]
-        
         # Get chain from different RPC calls
-        blockchain_chain = node.getblockchaininfo()['chain']
-        mining_chain = node.getmininginfo()['chain']
+        blockchain_chain = self._chain_info()['chain']
+        mining_chain = self._mining_info()['chain']
         
         # All should return the same BTQ chain identifier
         assert_equal(blockchain_chain, 'regtest')
@@ -80,7 +113,7 @@ class BTQChainIdentityTest(BTQTestFramework):
         assert_equal(len(genesis_block['tx']), 1)  # Only coinbase
         
         # Verify we're on BTQ chain
-        assert_equal(node.getblockchaininfo()['chain'], 'regtest')
+        assert_equal(self._chain_info()['chain'], 'regtest')
         
         self.log.info("✓ BTQ genesis block validation successful")
 
@@ -4,6 +4,7 @@
 # file COPYING or http://www.opensource.org/licenses/mit-license.php.
 """Test BTQ regtest mining functionality and chain identity."""
 
+from test_framework.blocktools import COINBASE_MATURITY
 from test_framework.test_framework import BTQTestFramework
 from test_framework.util import (
     assert_equal,
@@ -17,8 +18,16 @@ class BTQRegtestMiningTest(BTQTestFramework):
         self.num_nodes = 1
         self.setup_clean_chain = True
         self.chain = 'regtest'
+        self.extra_args = [[
+            '-persistmempool=0',
+            '-par=1',
+        ]]
 
     def run_test(self):
+        # Shared by all sub-tests: the RAW_P2PK key is deterministic, so every
+        # sub-test mines to and spends from the same descriptor
+        self.wallet = MiniWallet(self.nodes[0], mode=MiniWalletMode.RAW_P2PK)
+        self.desc = self.wallet.get_descriptor()
         self.test_btq_chain_identity()
         self.test_regtest_mining()
         self.test_generateblock_functionality()
@@ -43,15 +52,13 @@ class BTQRegtestMiningTest(BTQTestFramework):
         self.log.info("Testing BTQ regtest mining...")
         
         node = self.nodes[0]
-        miniwallet = MiniWallet(node, mode=MiniWalletMode.RAW_P2PK)
         
         # Get initial state
         initial_height = node.getblockcount()
         
         # Generate a block
         # Use descriptor-based generation to avoid segwit/taproot and wallet deps
-        desc = miniwallet.get_descriptor()
-        block_hashes = self.generatetodescriptor(node, 1, desc)
+        block_hashes = self.generatetodescriptor(node, 1, self.desc)
         
         # Verify block was generated
         assert_equal(len(block_hashes), 1)
@@ -70,11 +77,9 @@ class BTQRegtestMiningTest(BTQTestFramework):
         self.log.info("Testing BTQ generateblock RPC...")
         
         node = self.nodes[0]
-        miniwallet = MiniWallet(node, mode=MiniWalletMode.RAW_P2PK)
-        desc = miniwallet.get_descriptor()
         
         # Test generateblock with empty transaction list
-        result = self.generateblock(node, output=desc, transactions=[])
+        result = self.generateblock(node, output=self.desc, transactions=[])
         assert 'hash' in result
         assert len(result['hash']) == 64  # Valid block hash
         
@@ -93,19 +98,21 @@ class BTQRegtestMiningTest(BTQTestFramework):
         self.log.info("Testing BTQ block generation with transactions...")
         
         node = self.nodes[0]
-        miniwallet = MiniWallet(node, mode=MiniWalletMode.RAW_P2PK)
         
-        # Generate some BTQ coins first
-        self.generatetodescriptor(node, 100, miniwallet.get_descriptor())
+        # Mature the first coinbase mined by the earlier sub-tests, counting
+        # the blocks they already built on top of it
+        blocks_to_maturity = COINBASE_MATURITY - node.getblockcount()
+        if blocks_to_maturity > 0:
+            self.generatetodescriptor(node, blocks_to_maturity, self.desc)
+        self.wallet.rescan_utxos()
         
         # Create a BTQ transaction
-        desc = miniwallet.get_descriptor()
-        utxo = miniwallet.get_utxo()
-        tx = miniwallet.create_self_transfer(utxo_to_spend=utxo)
+        utxo = self.wallet.get_utxo()
+        tx = self.wallet.create_self_transfer(utxo_to_spend=utxo)
         txid = node.sendrawtransaction(tx['hex'])
         
         # Generate BTQ block with this transaction
-        result = self.generateblock(node, output=desc, transactions=[txid])
+        result = self.generateblock(node, output=self.desc, transactions=[txid])
         
         # Verify transaction is in the block
         block = node.getblock(result['hash'], 2)  # verbosity=2 for full tx details
@@ -20,6 +20,14 @@ BIP-level comprehensive test suite covering:
   13. Multiple P2MR inputs in one transaction
 """
 
+from collections import namedtuple
+import concurrent.futures
+import copy
+import functools
+import re
+import threading
+
+from test_framework.authproxy import JSONRPCException
 from test_framework.blocktools import COINBASE_MATURITY
 from test_framework.messages import (
     COIN,
@@ -28,6 +36,7 @@ from test_framework.messages import (
     CTxIn,
     CTxInWitness,
     CTxOut,
+    CTxWitness,
     SEQUENCE_FINAL,
 )
 from test_framework.script import (
@@ -57,9 +66,35 @@ from test_framework.script import (
 )
 from test_framework.key import ECKey, compute_xonly_pubkey
 from test_framework.test_framework import BTQTestFramework
-from test_framework.util import assert_equal
+from test_framework.util import (
+    assert_equal,
+    get_rpc_proxy,
+)
 from test_framework.wallet import MiniWallet
 
+# Anyone-can-spend leaf script used by most test groups
+_OPTRUE_SCRIPT = CScript([OP_TRUE])
+_OPTRUE_BYTES = bytes(_OPTRUE_SCRIPT)
+
+# Outcome of a spend attempt; error is empty and txid set if it was accepted
+SpendResult = namedtuple('SpendResult', 'accepted,error,txid')
+
+# Case-insensitive matchers for the expected rejection reasons
+_WITNESS_RE = re.compile(r'witness|empty', re.IGNORECASE)
+_MISMATCH_RE = re.compile(r'mismatch', re.IGNORECASE)
+_MISMATCH_OR_WITNESS_RE = re.compile(r'mismatch|witness', re.IGNORECASE)
+_DILITHIUM_RE = re.compile(r'dilithium', re.IGNORECASE)
+_NOT_IN_TAPSCRIPT_RE = re.compile(r'not available in tapscript', re.IGNORECASE)
+_CHECKMULTISIG_RE = re.compile(r'checkmultisig', re.IGNORECASE)
+
+# Malformed control blocks for test 11: (label, control block, reason)
+_BAD_CBS = (
+    ('0 bytes (empty)',     b'',                        'too small, no control byte'),
+    ('2 bytes',             b'\xc1\x00',                'not 1 + 32*m (remainder = 1)'),
+    ('10 bytes',            b'\xc1' + b'\x00' * 9,     'not 1 + 32*m (remainder = 9)'),
+    ('34 bytes',            b'\xc1' + b'\x00' * 33,    'not 1 + 32*m (remainder = 1)'),
+)
+
 # ============================================================================
 #  Display helpers
 # ============================================================================
@@ -89,35 +124,84 @@ BANNER = f"""
 SEP      = f'{BLUE}{"=" * 78}{RESET}'
 SEP_THIN = f'{BLUE}{"-" * 78}{RESET}'
 
+# Constant parts of the helpers below, assembled once at import
+_SECTION_FMT = f'\n{SEP}\n{BOLD}  %s{RESET}\n{SEP}'
+_SUB_PREFIX = f'{SEP_THIN}\n  {YELLOW}\u25B6{RESET} {BOLD}'
+_OK_PREFIX = f'    {CHECK} {GREEN}PASSED{RESET}  '
+_DOT_PREFIX = f'    {DIM}\u2502{RESET} '
+_RESULT_FMT = f'    {DIM}\u2502{RESET} {DIM}%-30s{RESET} %s'
+_WHY_PREFIX = f'    {DIM}\u2502 WHY: '
+_HOW_PREFIX = f'    {DIM}\u2502 HOW: '
+_EXPECT_PREFIX = f'    {DIM}\u2502 EXPECT: '
+_GOT_PREFIX = f'    {DIM}\u2502 GOT:    '
+
 def section(t):
-    return f'\n{SEP}\n{BOLD}  {t}{RESET}\n{SEP}'
+    return _SECTION_FMT % t
 
 def sub(t):
-    return f'{SEP_THIN}\n  {YELLOW}\u25B6{RESET} {BOLD}{t}{RESET}'
+    return _SUB_PREFIX + t + RESET
 
 def ok(m=''):
-    return f'    {CHECK} {GREEN}PASSED{RESET}  {m}'
+    return _OK_PREFIX + m
 
 def dot(m):
-    return f'    {DIM}\u2502{RESET} {m}'
+    return _DOT_PREFIX + m
 
 def result_line(label, value):
-    return f'    {DIM}\u2502{RESET} {DIM}{label:30s}{RESET} {value}'
+    return _RESULT_FMT % (label, value)
 
 def why(m):
-    return f'    {DIM}\u2502 WHY: {m}{RESET}'
+    return _WHY_PREFIX + m + RESET
 
 def how(m):
-    return f'    {DIM}\u2502 HOW: {m}{RESET}'
+    return _HOW_PREFIX + m + RESET
 
 def expect(m):
-    return f'    {DIM}\u2502 EXPECT: {m}{RESET}'
+    return _EXPECT_PREFIX + m + RESET
 
 def got(m):
-    return f'    {DIM}\u2502 GOT:    {m}{RESET}'
+    return _GOT_PREFIX + m + RESET
+
+
+def _txid_int(fund_info):
+    """Return the funding txid as an int, parsing it once per fund info."""
+    txid_int = fund_info.get('txid_int')
+    if txid_int is None:
+        txid_int = fund_info['txid_int'] = int.from_bytes(bytes.fromhex(fund_info['txid']), 'big')
+    return txid_int
+
+
+def _mutated_branch(branch, idx, mask=0xff):
+    """Return a copy of a Merkle branch with the byte at idx XORed with mask."""
+    return b''.join((branch[:idx], bytes([branch[idx] ^ mask]), branch[idx + 1:]))
+
+
+def no_rpc(test):
+    """Mark a test group as pure byte inspection. RPC access through every
+    TestNode (and so through self.node, self.wallet and self.generate) is
+    disabled while it runs, so any stray funding or RPC call fails loudly."""
+    @functools.wraps(test)
+    def wrapper(self):
+        nodes = [node for node in self.nodes if node.rpc_connected]
+        for node in nodes:
+            node.rpc_connected = False
+        try:
+            return test(self)
+        finally:
+            for node in nodes:
+                node.rpc_connected = True
+    return wrapper
+
+
+# RPC connection of the current spend pool worker thread
+_WORKER_RPC = threading.local()
 
 
 class P2MRTest(BTQTestFramework):
+    def add_options(self, parser):
+        parser.add_argument("--filter", dest="filter", default="",
+                            help="Only run the test groups whose method name contains this substring")
+
     def set_test_params(self):
         self.num_nodes = 1
         self.setup_clean_chain = True
@@ -127,37 +211,65 @@ class P2MRTest(BTQTestFramework):
         print(BANNER)
         self.node = self.nodes[0]
         self.wallet = MiniWallet(self.node)
-        self.generate(self.wallet, COINBASE_MATURITY + 60)
-
-        self.test_01_output_format()
-        self.test_02_script_path_spend_mined()
-        self.test_03_no_key_path()
-        self.test_04_dilithium_p2mr_vs_p2tr()
-        self.test_05_dilithium_error_messages()
-        self.test_06_checkmultisig_blocked()
-        self.test_07_two_leaf_tree()
-        self.test_08_four_leaf_tree()
-        self.test_09_wrong_merkle_proof()
-        self.test_10_wrong_merkle_root()
-        self.test_11_invalid_control_block_sizes()
-        self.test_12_control_block_format()
-        self.test_13_parity_bit()
-        self.test_14_address_encoding()
-        self.test_15_multiple_inputs()
+        # One internal key for every P2TR comparison output; it never signs
+        self._pk = ECKey()
+        self._pk.generate()
+        self._xo, _ = compute_xonly_pubkey(self._pk.get_bytes())
+        # Script trees shared by several test groups, constructed once
+        self._p2mr_op_true = p2mr_construct([("l", _OPTRUE_SCRIPT)])
+        self._p2mr_two_leaf = p2mr_construct([("a", _OPTRUE_SCRIPT), ("b", CScript([OP_DROP, OP_TRUE]))])
+        # Only a few dozen 50_000 sat fundings are made. send_to chains them through
+        # the change output and every test group's block confirms that chain
+        # (and matures another coinbase), so a couple of mature coinbases suffice
+        self.generate(self.wallet, COINBASE_MATURITY + 2)
+        self._pending_txids = []
+        # spend outputs are only serialized, never mutated, so one CTxOut per
+        # scriptPubKey is shared by every spend to it
+        self._vout_cache = {}
+        self._pending_spends = []
+
+        tests = [
+            self.test_01_output_format,
+            self.test_02_script_path_spend_mined,
+            self.test_03_no_key_path,
+            self.test_04_dilithium_p2mr_vs_p2tr,
+            self.test_05_dilithium_error_messages,
+            self.test_06_checkmultisig_blocked,
+            self.test_07_two_leaf_tree,
+            self.test_08_four_leaf_tree,
+            self.test_09_wrong_merkle_proof,
+            self.test_10_wrong_merkle_root,
+            self.test_11_invalid_control_block_sizes,
+            self.test_12_control_block_format,
+            self.test_13_parity_bit,
+            self.test_14_address_encoding,
+            self.test_15_multiple_inputs,
+        ]
+        if self.options.filter:
+            tests = [test for test in tests if self.options.filter in test.__name__]
+
+        # Each test group's fundings and spends are confirmed together in a
+        # single block once the group has finished. Pool threads (and their
+        # RPC connections) are only started by the first spend_async() call.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4, initializer=self._connect_worker) as self._spend_pool:
+            for test in tests:
+                test()
+                self.flush_mined()
 
         print(section('ALL TESTS COMPLETE'))
-        print(f'\n  {CHECK} {GREEN}{BOLD}All 15 BIP360 P2MR test groups passed!{RESET}\n')
+        print(f'\n  {CHECK} {GREEN}{BOLD}All {len(tests)} BIP360 P2MR test groups passed!{RESET}\n')
 
     # ================================================================
     #  1 - Output Format
     # ================================================================
+    @no_rpc
     def test_01_output_format(self):
         print(section('TEST 1 \u2014 P2MR Output Format'))
 
         print(sub('1a. Verify P2MR scriptPubKey structure'))
         print(why('P2MR outputs must be exactly 34 bytes: OP_2 (0x52) + PUSH32 (0x20) + 32-byte Merkle root.'))
         print(how('Construct a P2MR with a single OP_TRUE leaf and inspect the raw scriptPubKey bytes.'))
-        p2mr = p2mr_construct([("leaf", CScript([OP_TRUE]))])
+        p2mr = self._p2mr_op_true
         spk = bytes(p2mr.scriptPubKey)
         assert spk[0] == 0x52 and spk[1] == 0x20 and len(spk) == 34
         print(result_line('Byte 0 (witness version):', f'0x{spk[0]:02x} (OP_2)'))
@@ -169,9 +281,7 @@ class P2MRTest(BTQTestFramework):
         print(sub('1b. P2MR and P2TR outputs are the same size'))
         print(why('P2MR should not increase UTXO set size compared to P2TR.'))
         print(how('Compare raw scriptPubKey sizes of P2MR and P2TR with identical leaf scripts.'))
-        pk = ECKey(); pk.generate()
-        xo, _ = compute_xonly_pubkey(pk.get_bytes())
-        tap = taproot_construct(xo, [("leaf", CScript([OP_TRUE]))])
+        tap = taproot_construct(self._xo, [("leaf", _OPTRUE_SCRIPT)])
         print(result_line('P2TR scriptPubKey size:', f'{len(bytes(tap.scriptPubKey))} bytes'))
         print(result_line('P2MR scriptPubKey size:', f'{len(spk)} bytes'))
         assert len(bytes(tap.scriptPubKey)) == 34
@@ -186,15 +296,15 @@ class P2MRTest(BTQTestFramework):
         print(sub('2a. Spend OP_TRUE leaf and confirm in a block'))
         print(why('Verifies P2MR script path spending works at both the mempool policy and consensus levels.'))
         print(how('Create P2MR with OP_TRUE leaf, fund it, spend via script path, mine, check tx is in block.'))
-        p2mr = p2mr_construct([("leaf", CScript([OP_TRUE]))])
+        p2mr = self._p2mr_op_true
         fund = self.fund(p2mr.scriptPubKey)
-        r = self.spend_p2mr(fund, p2mr, "leaf", [])
-        assert r['accepted'], f"Should accept: {r['error']}"
+        r = self.spend_p2mr(fund, p2mr, "l", [])
+        assert r.accepted, f"Should accept: {r.error}"
         print(result_line('Mempool accepted:', 'yes'))
-        self.mine_and_verify(r['txid'])
-        print(result_line('Mined in block:', 'yes'))
-        print(result_line('Txid:', f'{r["txid"][:24]}...'))
-        print(ok('Spend confirmed at consensus level'))
+        self.queue_for_block(r.txid)
+        print(result_line('Queued for block:', 'yes'))
+        print(result_line('Txid:', f'{r.txid[:24]}...'))
+        print(ok('Spend accepted; block inclusion is checked when the group ends'))
 
         print(sub('2b. Hash lock script: OP_EQUAL with secret preimage'))
         print(why('Verifies non-trivial script execution works inside a P2MR output.'))
@@ -203,39 +313,40 @@ class P2MRTest(BTQTestFramework):
         p2mr = p2mr_construct([("leaf", CScript([secret, OP_EQUAL]))])
         fund = self.fund(p2mr.scriptPubKey)
         r = self.spend_p2mr(fund, p2mr, "leaf", [secret])
-        assert r['accepted']
-        self.mine_and_verify(r['txid'])
+        assert r.accepted
+        self.queue_for_block(r.txid)
         print(result_line('Secret:', secret.decode()))
-        print(result_line('Mempool + mined:', 'yes'))
-        print(ok('Hash lock spend confirmed'))
+        print(result_line('Mempool accepted:', 'yes (queued for block)'))
+        print(ok('Hash lock spend accepted'))
 
     # ================================================================
     #  3 - No Key Path
     # ================================================================
     def test_03_no_key_path(self):
         print(section('TEST 3 \u2014 No Key Path (P2MR is script-path only)'))
-        p2mr = p2mr_construct([("leaf", CScript([OP_TRUE]))])
+        p2mr = self._p2mr_op_true
+        spk = p2mr.scriptPubKey
+        # Both spends are rejected, so they can share one funding output
+        fund = self.fund(spk)
 
         print(sub('3a. Empty witness (0 elements)'))
         print(why('P2MR requires at least 2 witness elements (script + control block). Zero is invalid.'))
         print(how('Submit a transaction spending a P2MR output with an empty witness stack.'))
         print(expect('Rejection with "witness" or "empty" error'))
-        fund = self.fund(p2mr.scriptPubKey)
-        r = self.raw_spend(fund, p2mr.scriptPubKey, [])
-        assert not r['accepted']
-        assert 'witness' in r['error'].lower() or 'empty' in r['error'].lower()
-        print(got(f'{r["error"][:70]}'))
+        r = self.raw_spend(fund, spk, [])
+        assert not r.accepted
+        assert _WITNESS_RE.search(r.error)
+        print(got(f'{r.error[:70]}'))
         print(ok('Empty witness correctly rejected'))
 
         print(sub('3b. Single witness element (simulating a Taproot key-path spend)'))
         print(why('In Taproot, a single witness element = key path spend. P2MR has no key path, so this must fail.'))
         print(how('Submit a 64-byte fake signature as the only witness element.'))
         print(expect('Rejection with "mismatch" error'))
-        fund = self.fund(p2mr.scriptPubKey)
-        r = self.raw_spend(fund, p2mr.scriptPubKey, [b'\x00' * 64])
-        assert not r['accepted']
-        assert 'mismatch' in r['error'].lower() or 'witness' in r['error'].lower()
-        print(got(f'{r["error"][:70]}'))
+        r = self.raw_spend(fund, spk, [b'\x00' * 64])
+        assert not r.accepted
+        assert _MISMATCH_OR_WITNESS_RE.search(r.error)
+        print(got(f'{r.error[:70]}'))
         print(ok('Key-path-style spend correctly rejected'))
 
     # ================================================================
@@ -248,9 +359,6 @@ class P2MRTest(BTQTestFramework):
         print(dot('  - ALLOWED in P2MR tapscript (no key path, so Dilithium provides real protection)'))
         print(dot(''))
 
-        pk = ECKey(); pk.generate()
-        xo, _ = compute_xonly_pubkey(pk.get_bytes())
-
         opcodes = [
             ('OP_CHECKSIGDILITHIUM',            OP_CHECKSIGDILITHIUM,           '0xbb'),
             ('OP_CHECKSIGDILITHIUMVERIFY',      OP_CHECKSIGDILITHIUMVERIFY,     '0xbc'),
@@ -258,30 +366,39 @@ class P2MRTest(BTQTestFramework):
             ('OP_CHECKMULTISIGDILITHIUMVERIFY',  OP_CHECKMULTISIGDILITHIUMVERIFY,'0xbe'),
             ('OP_DILITHIUM_PUBKEY',             OP_DILITHIUM_PUBKEY,            '0xbf'),
         ]
-        for name, op, hex_val in opcodes:
-            print(sub(f'{name} ({hex_val})'))
+
+        # Fund a P2TR and a P2MR output per opcode up front in a single
+        # transaction; only the spends below are submitted in parallel.
+        spends = []
+        for _, op, _ in opcodes:
             leaf = CScript([OP_TRUE, OP_TRUE, op])
+            spends.append((self.spend_taproot, taproot_construct(self._xo, [("l", leaf)])))
+            spends.append((self.spend_p2mr, p2mr_construct([("l", leaf)])))
+        funds = self.fund_many([tree.scriptPubKey for _, tree in spends])
+        spends = [(spend_fn, f, tree) for (spend_fn, tree), f in zip(spends, funds)]
+
+        # Every spend has its own funding output, so they can all be in flight at once
+        futures = [self.spend_async(spend_fn, f, tree, "l", [b'\x01', b'\x01']) for spend_fn, f, tree in spends]
+        results = [future.result() for future in futures]
+
+        for i, (name, _, hex_val) in enumerate(opcodes):
+            r, r2 = results[2 * i], results[2 * i + 1]
+            print(sub(f'{name} ({hex_val})'))
 
             # P2TR test
             print(how(f'Place [{name}] in a P2TR tapscript leaf and attempt to spend'))
             print(expect('Rejection mentioning "dilithium"'))
-            tap = taproot_construct(xo, [("l", leaf)])
-            f = self.fund(tap.scriptPubKey)
-            r = self.spend_taproot(f, tap, "l", [b'\x01', b'\x01'])
-            assert not r['accepted']
-            assert 'dilithium' in r['error'].lower(), f'P2TR error should mention Dilithium: {r["error"][:60]}'
-            print(got(f'P2TR rejected: {r["error"][:55]}'))
+            assert not r.accepted
+            assert _DILITHIUM_RE.search(r.error), f'P2TR error should mention Dilithium: {r.error[:60]}'
+            print(got(f'P2TR rejected: {r.error[:55]}'))
 
             # P2MR test
             print(how(f'Place same [{name}] in a P2MR tapscript leaf and attempt to spend'))
             print(expect('NOT rejected for "not available in tapscript" (may fail for other reasons like invalid sig)'))
-            p2mr = p2mr_construct([("l", leaf)])
-            f2 = self.fund(p2mr.scriptPubKey)
-            r2 = self.spend_p2mr(f2, p2mr, "l", [b'\x01', b'\x01'])
-            if not r2['accepted']:
-                assert 'not available in tapscript' not in r2['error'].lower(), \
-                    f'{name} blocked in P2MR! {r2["error"]}'
-                print(got(f'P2MR ran opcode, failed on sig/pubkey: {r2["error"][:45]}'))
+            if not r2.accepted:
+                assert not _NOT_IN_TAPSCRIPT_RE.search(r2.error), \
+                    f'{name} blocked in P2MR! {r2.error}'
+                print(got(f'P2MR ran opcode, failed on sig/pubkey: {r2.error[:45]}'))
             else:
                 print(got('P2MR accepted'))
             print(ok(f'{name}: P2TR=blocked, P2MR=allowed'))
@@ -291,8 +408,6 @@ class P2MRTest(BTQTestFramework):
     # ================================================================
     def test_05_dilithium_error_messages(self):
         print(section('TEST 5 \u2014 Error Message Verification'))
-        pk = ECKey(); pk.generate()
-        xo, _ = compute_xonly_pubkey(pk.get_bytes())
 
         print(sub('5a. P2TR must return exact error message'))
         print(why('The error message distinguishes "Dilithium blocked in tapscript" from other failures.'))
@@ -300,10 +415,10 @@ class P2MRTest(BTQTestFramework):
         expected_msg = 'Dilithium opcodes are not available in tapscript'
         print(expect(f'Error contains: "{expected_msg}"'))
         leaf = CScript([OP_TRUE, OP_TRUE, OP_CHECKSIGDILITHIUM])
-        tap = taproot_construct(xo, [("l", leaf)])
+        tap = taproot_construct(self._xo, [("l", leaf)])
         f = self.fund(tap.scriptPubKey)
         r = self.spend_taproot(f, tap, "l", [b'\x01', b'\x01'])
-        assert expected_msg in r['error'], f'Expected "{expected_msg}" in: {r["error"][:80]}'
+        assert expected_msg in r.error, f'Expected "{expected_msg}" in: {r.error[:80]}'
         print(got(f'"{expected_msg}"'))
         print(ok('Exact error message verified'))
 
@@ -314,9 +429,9 @@ class P2MRTest(BTQTestFramework):
         p2mr = p2mr_construct([("l", leaf)])
         f2 = self.fund(p2mr.scriptPubKey)
         r2 = self.spend_p2mr(f2, p2mr, "l", [b'\x01', b'\x01'])
-        if not r2['accepted']:
-            assert expected_msg not in r2['error'], f'P2MR must not have tapscript error: {r2["error"][:80]}'
-            print(got(f'Error: {r2["error"][:60]}'))
+        if not r2.accepted:
+            assert expected_msg not in r2.error, f'P2MR must not have tapscript error: {r2.error[:80]}'
+            print(got(f'Error: {r2.error[:60]}'))
         else:
             print(got('Accepted (no error)'))
         print(ok('P2MR error correctly differs from P2TR'))
@@ -336,9 +451,9 @@ class P2MRTest(BTQTestFramework):
         p2mr = p2mr_construct([("l", leaf)])
         f = self.fund(p2mr.scriptPubKey)
         r = self.spend_p2mr(f, p2mr, "l", [b'', b'\x01'])
-        assert not r['accepted']
-        assert 'checkmultisig' in r['error'].lower(), f'Error should mention checkmultisig: {r["error"][:70]}'
-        print(got(f'{r["error"][:65]}'))
+        assert not r.accepted
+        assert _CHECKMULTISIG_RE.search(r.error), f'Error should mention checkmultisig: {r.error[:70]}'
+        print(got(f'{r.error[:65]}'))
         print(ok('OP_CHECKMULTISIG correctly blocked (use OP_CHECKSIGADD in tapscript)'))
 
     # ================================================================
@@ -348,20 +463,19 @@ class P2MRTest(BTQTestFramework):
         print(section('TEST 7 \u2014 Two-Leaf Script Tree'))
         print(why('Verifies the Merkle tree construction works with 2 leaves at depth 1.'))
         print(how('Build tree with leaf_a=[OP_TRUE] and leaf_b=[OP_DROP OP_TRUE]. Spend each independently.'))
-        la = CScript([OP_TRUE])
-        lb = CScript([OP_DROP, OP_TRUE])
-        p2mr = p2mr_construct([("a", la), ("b", lb)])
+        p2mr = self._p2mr_two_leaf
+        spk = p2mr.scriptPubKey
 
         for name, stk, desc in [("a", [], "OP_TRUE (no witness data)"), ("b", [b'\x01'], "OP_DROP OP_TRUE (1 stack element)")]:
             print(sub(f'7. Spend leaf "{name}" ({desc})'))
             print(how(f'Fund P2MR, spend via leaf "{name}" with witness stack {stk}, mine and verify.'))
-            f = self.fund(p2mr.scriptPubKey)
+            f = self.fund(spk)
             r = self.spend_p2mr(f, p2mr, name, stk)
-            assert r['accepted'], f'Leaf {name}: {r["error"]}'
-            self.mine_and_verify(r['txid'])
+            assert r.accepted, f'Leaf {name}: {r.error}'
+            self.queue_for_block(r.txid)
             pl = len(p2mr.leaves[name].merklebranch) // 32
             print(result_line('Merkle path length:', f'{pl} node(s)'))
-            print(result_line('Mined in block:', 'yes'))
+            print(result_line('Queued for block:', 'yes'))
             print(ok())
 
     # ================================================================
@@ -371,11 +485,12 @@ class P2MRTest(BTQTestFramework):
         print(section('TEST 8 \u2014 Four-Leaf Tree (Depth 2)'))
         print(why('Verifies deeper Merkle trees work correctly with 2 levels of branching.'))
         print(how('Build a balanced tree: [[a, b], [c, d]]. Each leaf is a distinct anyone-can-spend script.'))
-        la = CScript([OP_TRUE])
+        la = _OPTRUE_SCRIPT
         lb = CScript([OP_DROP, OP_TRUE])
         lc = CScript([OP_2, OP_DROP, OP_TRUE])
         ld = CScript([OP_1, OP_DROP, OP_TRUE])
         p2mr = p2mr_construct([[("a", la), ("b", lb)], [("c", lc), ("d", ld)]])
+        spk = p2mr.scriptPubKey
         print(dot('Tree structure: [[a, b], [c, d]]'))
         print(dot(f'Merkle root: {p2mr.merkle_root.hex()[:32]}...'))
         print(dot(''))
@@ -383,15 +498,15 @@ class P2MRTest(BTQTestFramework):
         for name, stk in [("a", []), ("b", [b'\x01']), ("c", []), ("d", [])]:
             print(sub(f'8. Leaf "{name}" at depth 2'))
             print(how(f'Spend via leaf "{name}", verify Merkle proof and mine.'))
-            f = self.fund(p2mr.scriptPubKey)
+            f = self.fund(spk)
             r = self.spend_p2mr(f, p2mr, name, stk)
-            if not r['accepted']:
-                print(got(f'Error: {r["error"][:70]}'))
-            assert r['accepted'], f'Leaf {name}: {r["error"][:80]}'
-            self.mine_and_verify(r['txid'])
+            if not r.accepted:
+                print(got(f'Error: {r.error[:70]}'))
+            assert r.accepted, f'Leaf {name}: {r.error[:80]}'
+            self.queue_for_block(r.txid)
             pl = len(p2mr.leaves[name].merklebranch) // 32
             print(result_line('Merkle path depth:', f'{pl} nodes'))
-            print(result_line('Confirmed in block:', 'yes'))
+            print(result_line('Queued for block:', 'yes'))
             print(ok())
 
     # ================================================================
@@ -404,17 +519,15 @@ class P2MRTest(BTQTestFramework):
         print(why('If an attacker flips bits in the Merkle path, the computed root will not match the output.'))
         print(how('Build valid 2-leaf P2MR, flip first and last bytes of the Merkle branch, try to spend.'))
         print(expect('Rejection with "mismatch" (computed Merkle root != witness program)'))
-        p2mr = p2mr_construct([("a", CScript([OP_TRUE])), ("b", CScript([OP_DROP, OP_TRUE]))])
-        f = self.fund(p2mr.scriptPubKey)
+        p2mr = self._p2mr_two_leaf
+        spk = p2mr.scriptPubKey
+        f = self.fund(spk)
         leaf = p2mr.leaves["a"]
-        bad_branch = bytearray(leaf.merklebranch)
-        if len(bad_branch) > 0:
-            bad_branch[0] ^= 0xff
-        r = self.spend_raw_cb(f, p2mr.scriptPubKey, bytes(leaf.script),
-                              bytes([leaf.version | 1]) + bytes(bad_branch), [])
-        assert not r['accepted']
-        assert 'mismatch' in r['error'].lower()
-        print(got(f'{r["error"][:65]}'))
+        bad_cb = leaf.control_block[:1] + _mutated_branch(leaf.merklebranch, 0)
+        r = self.spend_raw_cb(f, spk, leaf.script, bad_cb, [])
+        assert not r.accepted
+        assert _MISMATCH_RE.search(r.error)
+        print(got(f'{r.error[:65]}'))
         print(ok('Corrupted Merkle proof rejected'))
 
     # ================================================================
@@ -427,15 +540,15 @@ class P2MRTest(BTQTestFramework):
         print(why('Each P2MR output commits to a specific Merkle root. A proof from a different tree must fail.'))
         print(how('Build two P2MR trees with different leaf scripts. Fund tree A, try to spend with tree B proof.'))
         print(expect('Rejection with "mismatch"'))
-        ta = p2mr_construct([("l", CScript([OP_TRUE]))])
+        ta = self._p2mr_op_true
         tb = p2mr_construct([("l", CScript([OP_1, OP_DROP, OP_TRUE]))])
         print(result_line('Tree A root:', f'{ta.merkle_root.hex()[:32]}...'))
         print(result_line('Tree B root:', f'{tb.merkle_root.hex()[:32]}...'))
         f = self.fund(ta.scriptPubKey)
         r = self.spend_p2mr(f, tb, "l", [])
-        assert not r['accepted']
-        assert 'mismatch' in r['error'].lower()
-        print(got(f'{r["error"][:65]}'))
+        assert not r.accepted
+        assert _MISMATCH_RE.search(r.error)
+        print(got(f'{r.error[:65]}'))
         print(ok('Cross-tree spend rejected'))
 
     # ================================================================
@@ -445,32 +558,33 @@ class P2MRTest(BTQTestFramework):
         print(section('TEST 11 \u2014 Invalid Control Block Sizes'))
         print(why('P2MR control blocks must be exactly 1 + 32*m bytes (m = 0, 1, 2, ..., 128).'))
         print(why('Sizes that do not match this formula must be rejected.'))
-        p2mr = p2mr_construct([("l", CScript([OP_TRUE]))])
-        cases = [
-            ('0 bytes (empty)',     b'',                        'too small, no control byte'),
-            ('2 bytes',             b'\xc1\x00',                'not 1 + 32*m (remainder = 1)'),
-            ('10 bytes',            b'\xc1' + b'\x00' * 9,     'not 1 + 32*m (remainder = 9)'),
-            ('34 bytes',            b'\xc1' + b'\x00' * 33,    'not 1 + 32*m (remainder = 1)'),
-        ]
-        for label, bad_cb, reason in cases:
+        p2mr = self._p2mr_op_true
+        spk = p2mr.scriptPubKey
+        # Every case is rejected, so all of them can spend the same output
+        f = self.fund(spk)
+        tx_template = self.spend_tx(f, spk)
+        for _, bad_cb, _ in _BAD_CBS:
+            self.spend_raw_cb(f, spk, _OPTRUE_BYTES, bad_cb, [], tx_template=tx_template, defer=True)
+        results = self.flush_spends()
+        assert_equal(len(results), len(_BAD_CBS))
+        for (label, _, reason), r in zip(_BAD_CBS, results):
             print(sub(f'11. Control block = {label}'))
             print(how(f'Submit spend with malformed control block ({reason}).'))
             print(expect('Rejection'))
-            f = self.fund(p2mr.scriptPubKey)
-            r = self.spend_raw_cb(f, p2mr.scriptPubKey, bytes(CScript([OP_TRUE])), bad_cb, [])
-            assert not r['accepted']
-            print(got(f'{r["error"][:65]}'))
+            assert not r.accepted
+            print(got(f'{r.error[:65]}'))
             print(ok())
 
     # ================================================================
     # 12 - Control Block Format
     # ================================================================
+    @no_rpc
     def test_12_control_block_format(self):
         print(section('TEST 12 \u2014 Control Block Format'))
 
         print(sub('12a. Single leaf: control block = 1 byte (just the control byte)'))
         print(why('With only one leaf, no Merkle path is needed. Control block = [control_byte].'))
-        p1 = p2mr_construct([("l", CScript([OP_TRUE]))])
+        p1 = self._p2mr_op_true
         cb1 = 1 + len(p1.leaves["l"].merklebranch)
         assert cb1 == 1
         print(result_line('Control block size:', f'{cb1} byte'))
@@ -478,7 +592,7 @@ class P2MRTest(BTQTestFramework):
 
         print(sub('12b. Two leaves: control block = 33 bytes (1 byte + 32-byte sibling hash)'))
         print(why('With two leaves, the Merkle proof contains one 32-byte sibling hash.'))
-        p2 = p2mr_construct([("a", CScript([OP_TRUE])), ("b", CScript([OP_DROP, OP_TRUE]))])
+        p2 = self._p2mr_two_leaf
         cb2 = 1 + len(p2.leaves["a"].merklebranch)
         assert cb2 == 33
         print(result_line('Control block size:', f'{cb2} bytes (1 + 32)'))
@@ -487,9 +601,7 @@ class P2MRTest(BTQTestFramework):
         print(sub('12c. P2MR control block is 32 bytes smaller than P2TR'))
         print(why('P2TR control block includes the 32-byte internal key. P2MR omits it (no key path).'))
         print(how('Build identical 2-leaf trees in P2TR and P2MR, compare control block sizes.'))
-        pk = ECKey(); pk.generate()
-        xo, _ = compute_xonly_pubkey(pk.get_bytes())
-        tap = taproot_construct(xo, [("a", CScript([OP_TRUE])), ("b", CScript([OP_DROP, OP_TRUE]))])
+        tap = taproot_construct(self._xo, [("a", _OPTRUE_SCRIPT), ("b", CScript([OP_DROP, OP_TRUE]))])
         tr_cb = 1 + 32 + len(tap.leaves["a"].merklebranch)
         mr_cb = 1 + len(p2.leaves["a"].merklebranch)
         savings = tr_cb - mr_cb
@@ -508,32 +620,33 @@ class P2MRTest(BTQTestFramework):
         print(why('This is because P2MR has no internal key, so there is no parity to encode.'))
         print(why('The bit is fixed at 1 to maintain encoding compatibility with Taproot leaf versions.'))
 
-        p2mr = p2mr_construct([("l", CScript([OP_TRUE]))])
+        p2mr = self._p2mr_op_true
+        spk = p2mr.scriptPubKey
         leaf = p2mr.leaves["l"]
 
         print(sub('13a. Parity bit = 1 (correct per BIP360)'))
         print(how('Construct control byte with bit 0 = 1, spend, mine.'))
         print(expect('Accepted and confirmed in block'))
-        f = self.fund(p2mr.scriptPubKey)
-        cb_good = bytes([leaf.version | 1]) + leaf.merklebranch
+        f = self.fund(spk)
+        cb_good = leaf.control_block
         print(result_line('Control byte:', f'0x{cb_good[0]:02x} (leaf_version | 1, bit 0 = 1)'))
-        r = self.spend_raw_cb(f, p2mr.scriptPubKey, bytes(leaf.script), cb_good, [])
-        assert r['accepted'], f'Parity=1 should accept: {r["error"]}'
-        self.mine_and_verify(r['txid'])
-        print(result_line('Result:', 'accepted + mined'))
+        r = self.spend_raw_cb(f, spk, leaf.script, cb_good, [])
+        assert r.accepted, f'Parity=1 should accept: {r.error}'
+        self.queue_for_block(r.txid)
+        print(result_line('Result:', 'accepted, queued for block'))
         print(ok())
 
         print(sub('13b. Parity bit = 0 (violates BIP360)'))
         print(how('Construct control byte with bit 0 = 0, attempt to spend.'))
         print(expect('Rejection with "mismatch" error'))
-        f2 = self.fund(p2mr.scriptPubKey)
+        f2 = self.fund(spk)
         cb_bad = bytes([leaf.version & 0xfe]) + leaf.merklebranch
         print(result_line('Control byte:', f'0x{cb_bad[0]:02x} (leaf_version & 0xfe, bit 0 = 0)'))
-        r2 = self.spend_raw_cb(f2, p2mr.scriptPubKey, bytes(leaf.script), cb_bad, [])
-        assert not r2['accepted']
-        assert 'mismatch' in r2['error'].lower()
+        r2 = self.spend_raw_cb(f2, spk, leaf.script, cb_bad, [])
+        assert not r2.accepted
+        assert _MISMATCH_RE.search(r2.error)
         print(result_line('Result:', 'rejected'))
-        print(got(f'{r2["error"][:65]}'))
+        print(got(f'{r2.error[:65]}'))
         print(ok('Parity bit enforced per BIP360 spec'))
 
     # ================================================================
@@ -546,7 +659,7 @@ class P2MRTest(BTQTestFramework):
         print(why('P2MR uses SegWit version 2. In bech32m, version 2 maps to the character "z" after the separator.'))
         print(why('BTQ uses HRP "qcrt" for regtest, so P2MR addresses start with "qcrt1z".'))
         print(how('Fund a P2MR output, look up the transaction, and inspect the address field.'))
-        p2mr = p2mr_construct([("l", CScript([OP_TRUE]))])
+        p2mr = self._p2mr_op_true
         fund = self.wallet.send_to(from_node=self.node, scriptPubKey=p2mr.scriptPubKey, amount=50_000)
         block_hashes = self.generate(self.node, 1)
         tx_info = self.node.getrawtransaction(fund['txid'], True, block_hashes[0])
@@ -572,40 +685,36 @@ class P2MRTest(BTQTestFramework):
         print(sub('15a. Two P2MR inputs from different trees'))
         print(why('Real transactions may spend multiple P2MR outputs at once.'))
         print(how('Create two P2MR outputs with different scripts, spend both in a single transaction.'))
-        p2mr_a = p2mr_construct([("l", CScript([OP_TRUE]))])
+        p2mr_a = self._p2mr_op_true
         p2mr_b = p2mr_construct([("l", CScript([OP_1, OP_DROP, OP_TRUE]))])
 
-        fa = self.fund(p2mr_a.scriptPubKey)
-        fb = self.fund(p2mr_b.scriptPubKey)
+        fa, fb = self.fund_many([p2mr_a.scriptPubKey, p2mr_b.scriptPubKey])
 
         tx = CTransaction()
         tx.nVersion = 2
         tx.vin = [
-            CTxIn(COutPoint(int(fa['txid'], 16), fa['sent_vout']), b'', SEQUENCE_FINAL),
-            CTxIn(COutPoint(int(fb['txid'], 16), fb['sent_vout']), b'', SEQUENCE_FINAL),
+            CTxIn(COutPoint(_txid_int(fa), fa['sent_vout']), b'', SEQUENCE_FINAL),
+            CTxIn(COutPoint(_txid_int(fb), fb['sent_vout']), b'', SEQUENCE_FINAL),
         ]
         tx.vout = [CTxOut(80_000, p2mr_a.scriptPubKey)]
 
         leaf_a = p2mr_a.leaves["l"]
-        cb_a = bytes([leaf_a.version | 1]) + leaf_a.merklebranch
         wit_a = CTxInWitness()
-        wit_a.scriptWitness.stack = [bytes(leaf_a.script), cb_a]
+        wit_a.scriptWitness.stack = [leaf_a.script, leaf_a.control_block]
 
         leaf_b = p2mr_b.leaves["l"]
-        cb_b = bytes([leaf_b.version | 1]) + leaf_b.merklebranch
         wit_b = CTxInWitness()
-        wit_b.scriptWitness.stack = [bytes(leaf_b.script), cb_b]
+        wit_b.scriptWitness.stack = [leaf_b.script, leaf_b.control_block]
 
         tx.wit.vtxinwit = [wit_a, wit_b]
-        tx.rehash()
 
         try:
             txid = self.node.sendrawtransaction(tx.serialize().hex())
             print(result_line('Input 0:', f'P2MR tree A (OP_TRUE)'))
             print(result_line('Input 1:', f'P2MR tree B (OP_1 OP_DROP OP_TRUE)'))
             print(result_line('Mempool accepted:', 'yes'))
-            self.mine_and_verify(txid)
-            print(result_line('Mined in block:', 'yes'))
+            self.queue_for_block(txid)
+            print(result_line('Queued for block:', 'yes'))
             print(ok('Multi-input P2MR transaction works'))
         except Exception as e:
             assert False, f'Multi-input P2MR should succeed: {e}'
@@ -615,89 +724,122 @@ class P2MRTest(BTQTestFramework):
     # ================================================================
 
     def fund(self, spk):
+        """Fund spk from the mempool; the output is confirmed by flush_mined()."""
         f = self.wallet.send_to(from_node=self.node, scriptPubKey=spk, amount=50_000)
-        self.generate(self.node, 1)
+        self._pending_txids.append(f['txid'])
         return f
 
-    def mine_and_verify(self, txid):
+    def fund_many(self, spks):
+        """Fund every spk with one transaction; returns one fund info per spk."""
+        f = self.wallet.send_to_many(from_node=self.node, outputs=[(spk, 50_000) for spk in spks])
+        self._pending_txids.append(f['txid'])
+        txid_int = _txid_int(f)
+        return [{'txid': f['txid'], 'txid_int': txid_int, 'sent_vout': vout} for vout in f['sent_vouts']]
+
+    def queue_for_block(self, txid):
+        """Queue txid to be checked for inclusion by the next flush_mined()."""
+        self._pending_txids.append(txid)
+
+    def flush_mined(self):
+        """Mine one block and verify that all queued txids are in it."""
+        if not self._pending_txids:
+            return
         block_hashes = self.generate(self.node, 1)
-        block = self.node.getblock(block_hashes[0])
-        assert txid in block['tx'], f'txid {txid[:16]}... not in mined block'
-
-    def spend_p2mr(self, fund_info, p2mr, leaf_name, witness_stack):
-        try:
-            tx = CTransaction()
-            tx.nVersion = 2
-            tx.vin = [CTxIn(COutPoint(int(fund_info['txid'], 16), fund_info['sent_vout']), b'', SEQUENCE_FINAL)]
-            tx.vout = [CTxOut(40_000, p2mr.scriptPubKey)]
-            leaf = p2mr.leaves[leaf_name]
-            cb = bytes([leaf.version | 1]) + leaf.merklebranch
-            wit = CTxInWitness()
-            for item in witness_stack:
-                wit.scriptWitness.stack.append(item)
-            wit.scriptWitness.stack.append(bytes(leaf.script))
-            wit.scriptWitness.stack.append(cb)
-            tx.wit.vtxinwit = [wit]
-            tx.rehash()
-            txid = self.node.sendrawtransaction(tx.serialize().hex())
-            return {'accepted': True, 'error': '', 'txid': txid}
-        except Exception as e:
-            return {'accepted': False, 'error': str(e), 'txid': ''}
-
-    def spend_taproot(self, fund_info, tap, leaf_name, witness_stack):
-        try:
-            tx = CTransaction()
-            tx.nVersion = 2
-            tx.vin = [CTxIn(COutPoint(int(fund_info['txid'], 16), fund_info['sent_vout']), b'', SEQUENCE_FINAL)]
-            tx.vout = [CTxOut(40_000, tap.scriptPubKey)]
-            leaf = tap.leaves[leaf_name]
-            cb = bytes([leaf.version | (1 if tap.negflag else 0)]) + tap.internal_pubkey
-            for h in leaf.merklebranch:
-                cb += h
-            wit = CTxInWitness()
-            for item in witness_stack:
-                wit.scriptWitness.stack.append(item)
-            wit.scriptWitness.stack.append(bytes(leaf.script))
-            wit.scriptWitness.stack.append(cb)
-            tx.wit.vtxinwit = [wit]
-            tx.rehash()
-            txid = self.node.sendrawtransaction(tx.serialize().hex())
-            return {'accepted': True, 'error': '', 'txid': txid}
-        except Exception as e:
-            return {'accepted': False, 'error': str(e), 'txid': ''}
-
-    def raw_spend(self, fund_info, output_spk, witness_stack):
-        try:
-            tx = CTransaction()
-            tx.nVersion = 2
-            tx.vin = [CTxIn(COutPoint(int(fund_info['txid'], 16), fund_info['sent_vout']), b'', SEQUENCE_FINAL)]
-            tx.vout = [CTxOut(40_000, output_spk)]
-            wit = CTxInWitness()
-            wit.scriptWitness.stack = witness_stack
-            tx.wit.vtxinwit = [wit]
-            tx.rehash()
-            txid = self.node.sendrawtransaction(tx.serialize().hex())
-            return {'accepted': True, 'error': '', 'txid': txid}
-        except Exception as e:
-            return {'accepted': False, 'error': str(e), 'txid': ''}
+        block_txs = set(self.node.getblock(block_hashes[0])['tx'])
+        for txid in self._pending_txids:
+            assert txid in block_txs, f'txid {txid[:16]}... not in mined block'
+        print(ok(f'{len(self._pending_txids)} queued transaction(s) confirmed in block'))
+        self._pending_txids = []
+
+    def spend_p2mr(self, fund_info, p2mr, leaf_name, witness_stack, *, rpc=None):
+        leaf = p2mr.leaves[leaf_name]
+        return self._submit_spend(fund_info, p2mr.scriptPubKey, witness_stack,
+                                  (leaf.script, leaf.control_block), rpc=rpc)
+
+    def spend_taproot(self, fund_info, tap, leaf_name, witness_stack, *, rpc=None):
+        leaf = tap.leaves[leaf_name]
+        return self._submit_spend(fund_info, tap.scriptPubKey, witness_stack,
+                                  (leaf.script, leaf.control_block), rpc=rpc)
+
+    def raw_spend(self, fund_info, output_spk, witness_stack, *, rpc=None, defer=False):
+        """Spend with witness_stack as the complete witness. With defer=True
+        the spend is queued for flush_spends() and None is returned."""
+        return self._submit_spend(fund_info, output_spk, witness_stack, rpc=rpc, defer=defer)
+
+    def spend_raw_cb(self, fund_info, output_spk, script, control_block, witness_stack, *, rpc=None, tx_template=None, defer=False):
+        """Spend with an explicit script and control block. A tx_template from
+        spend_tx(fund_info, output_spk) may be passed to reuse its inputs and
+        outputs; only the witness is replaced. With defer=True the spend is
+        queued for flush_spends() and None is returned."""
+        return self._submit_spend(fund_info, output_spk, witness_stack,
+                                  (script, control_block), rpc=rpc, tx_template=tx_template, defer=defer)
+
+    def spend_async(self, spend_fn, *args, **kwargs):
+        """Run one of the spend helpers on the spend pool, over that worker's
+        own RPC connection, and return a Future for its SpendResult.
+        Spends submitted together must not conflict with each other."""
+        return self._spend_pool.submit(lambda: spend_fn(*args, rpc=_WORKER_RPC.rpc, **kwargs))
+
+    def _connect_worker(self):
+        _WORKER_RPC.rpc = get_rpc_proxy(self.node.url, self.node.index, timeout=self.rpc_timeout, coveragedir=self.node.coverage_dir)
+
+    def flush_spends(self):
+        """Submit every deferred spend in a single batch RPC and return their
+        SpendResults in the order they were queued."""
+        requests = [self.node.sendrawtransaction.get_request(tx_hex) for tx_hex in self._pending_spends]
+        self._pending_spends = []
+        # Replies may come back in any order; match them to requests by id
+        replies = {res['id']: res for res in self.node.batch(requests)}
+        assert_equal(sorted(replies), sorted(req['id'] for req in requests))
+        results = []
+        for req in requests:
+            res = replies[req['id']]
+            if res['error'] is None:
+                results.append(SpendResult(True, '', res['result']))
+            else:
+                results.append(SpendResult(False, str(JSONRPCException(res['error'])), ''))
+        return results
 
-    def spend_raw_cb(self, fund_info, output_spk, script, control_block, witness_stack):
+    def spend_tx(self, fund_info, output_spk):
+        """Build the witness-less transaction spending fund_info to output_spk."""
+        tx = CTransaction()
+        tx.nVersion = 2
+        tx.vin = [CTxIn(COutPoint(_txid_int(fund_info), fund_info['sent_vout']), b'', SEQUENCE_FINAL)]
+        vout = self._vout_cache.get(output_spk)
+        if vout is None:
+            vout = self._vout_cache[output_spk] = CTxOut(40_000, output_spk)
+        tx.vout = [vout]
+        return tx
+
+    def _submit_spend(self, fund_info, output_spk, witness_stack, tail=(), *, rpc=None, tx_template=None, defer=False):
+        """Spend fund_info to output_spk with witness_stack followed by tail
+        (e.g. the leaf script and control block) and submit it to the mempool.
+        With defer=True the spend is queued for flush_spends() instead, which
+        always submits through self.node, and None is returned."""
+        assert not (defer and rpc is not None), 'deferred spends are submitted through self.node'
+        if rpc is None:
+            rpc = self.node
+        if tx_template is None:
+            tx = self.spend_tx(fund_info, output_spk)
+        else:
+            # The template must spend fund_info to output_spk, or the caller's
+            # arguments would silently be ignored
+            assert_equal(tx_template.vin[0].prevout.hash, _txid_int(fund_info))
+            assert_equal(tx_template.vin[0].prevout.n, fund_info['sent_vout'])
+            assert_equal(tx_template.vout[0].scriptPubKey, output_spk)
+            tx = copy.copy(tx_template)
+            tx.wit = CTxWitness()
+        wit = CTxInWitness()
+        wit.scriptWitness.stack = [*witness_stack, *tail]
+        tx.wit.vtxinwit = [wit]
+        if defer:
+            self._pending_spends.append(tx.serialize().hex())
+            return None
         try:
-            tx = CTransaction()
-            tx.nVersion = 2
-            tx.vin = [CTxIn(COutPoint(int(fund_info['txid'], 16), fund_info['sent_vout']), b'', SEQUENCE_FINAL)]
-            tx.vout = [CTxOut(40_000, output_spk)]
-            wit = CTxInWitness()
-            for item in witness_stack:
-                wit.scriptWitness.stack.append(item)
-            wit.scriptWitness.stack.append(script)
-            wit.scriptWitness.stack.append(control_block)
-            tx.wit.vtxinwit = [wit]
-            tx.rehash()
-            txid = self.node.sendrawtransaction(tx.serialize().hex())
-            return {'accepted': True, 'error': '', 'txid': txid}
-        except Exception as e:
-            return {'accepted': False, 'error': str(e), 'txid': ''}
+            txid = rpc.sendrawtransaction(tx.serialize().hex())
+        except JSONRPCException as e:
+            return SpendResult(False, str(e), '')
+        return SpendResult(True, '', txid)
 
 
 if __name__ == '__main__':
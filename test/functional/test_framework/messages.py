@@ -84,7 +84,7 @@ def sha3(s):
 
 
 def hash256(s):
-    return sha256(sha256(s))
+    return hashlib.sha256(hashlib.sha256(s).digest()).digest()
 
 
 def ser_compact_size(l):
@@ -648,9 +648,10 @@ class CTransaction:
             # Don't cache the result, just return it
             return uint256_from_str(hash256(self.serialize_with_witness()))
 
+        txid = hash256(self.serialize_without_witness())
         if self.sha256 is None:
-            self.sha256 = uint256_from_str(hash256(self.serialize_without_witness()))
-        self.hash = hash256(self.serialize_without_witness())[::-1].hex()
+            self.sha256 = uint256_from_str(txid)
+        self.hash = txid[::-1].hex()
 
     def is_valid(self):
         self.calc_sha256()
@@ -519,14 +519,14 @@ class CScript(bytes):
                     pushdata_type = 'PUSHDATA2'
                     if i + 1 >= len(self):
                         raise CScriptInvalidError('PUSHDATA2: missing data length')
-                    datasize = self[i] + (self[i + 1] << 8)
+                    datasize = int.from_bytes(self[i:i + 2], 'little')
                     i += 2
 
                 elif opcode == OP_PUSHDATA4:
                     pushdata_type = 'PUSHDATA4'
                     if i + 3 >= len(self):
                         raise CScriptInvalidError('PUSHDATA4: missing data length')
-                    datasize = self[i] + (self[i + 1] << 8) + (self[i + 2] << 16) + (self[i + 3] << 24)
+                    datasize = int.from_bytes(self[i:i + 4], 'little')
                     i += 4
 
                 else:
@@ -908,7 +908,9 @@ TaprootInfo = namedtuple("TaprootInfo", "scriptPubKey,internal_pubkey,negflag,tw
 # - script: the leaf script (CScript or bytes)
 # - version: the leaf version (0xc0 for BIP342 tapscript)
 # - merklebranch: the merkle branch to use for this leaf (32*N bytes)
-TaprootLeafInfo = namedtuple("TaprootLeafInfo", "script,version,merklebranch,leaf_hash")
+# - leaf_hash: the TapLeaf hash of this leaf (32 bytes)
+# - control_block: the full control block for a script path spend of this leaf (bytes)
+TaprootLeafInfo = namedtuple("TaprootLeafInfo", "script,version,merklebranch,leaf_hash,control_block")
 
 def taproot_construct(pubkey, scripts=None, treat_internal_as_infinity=False):
     """Construct a tree of Taproot spending conditions
@@ -933,7 +935,7 @@ def taproot_construct(pubkey, scripts=None, treat_internal_as_infinity=False):
         tweaked, negated = compute_xonly_pubkey(tweak)
     else:
         tweaked, negated = tweak_add_pubkey(pubkey, tweak)
-    leaves = dict((name, TaprootLeafInfo(script, version, merklebranch, leaf)) for name, version, script, merklebranch, leaf in ret)
+    leaves = dict((name, TaprootLeafInfo(script, version, merklebranch, leaf, bytes([version + negated]) + pubkey + merklebranch)) for name, version, script, merklebranch, leaf in ret)
     return TaprootInfo(CScript([OP_1, tweaked]), pubkey, negated + 0, tweak, leaves, h, tweaked)
 
 def is_op_success(o):
@@ -943,7 +945,9 @@ def is_op_success(o):
 
 # BIP360 P2MR (Pay-to-Merkle-Root) support
 P2MRInfo = namedtuple("P2MRInfo", "scriptPubKey,leaves,merkle_root")
-P2MRLeafInfo = namedtuple("P2MRLeafInfo", "script,version,merklebranch,leaf_hash")
+# A P2MRLeafInfo object has the same fields as TaprootLeafInfo; its control_block
+# has no internal key and always sets the parity bit, as BIP360 requires.
+P2MRLeafInfo = namedtuple("P2MRLeafInfo", "script,version,merklebranch,leaf_hash,control_block")
 
 def p2mr_construct(scripts=None):
     """Construct a P2MR (BIP360) output from a script tree (no internal key).
@@ -955,5 +959,5 @@ def p2mr_construct(scripts=None):
         scripts = []
 
     ret, h = taproot_tree_helper(scripts)
-    leaves = dict((name, P2MRLeafInfo(script, version, merklebranch, leaf)) for name, version, script, merklebranch, leaf in ret)
+    leaves = dict((name, P2MRLeafInfo(script, version, merklebranch, leaf, bytes([version | 1]) + merklebranch)) for name, version, script, merklebranch, leaf in ret)
     return P2MRInfo(CScript([OP_2, h]), leaves, h)
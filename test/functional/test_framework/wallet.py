@@ -266,12 +266,37 @@ class MiniWallet:
         assert_greater_than_or_equal(tx.vout[0].nValue, amount + fee)
         tx.vout[0].nValue -= (amount + fee)           # change output -> MiniWallet
         tx.vout.append(CTxOut(amount, scriptPubKey))  # arbitrary output -> to be returned
-        txid = self.sendrawtransaction(from_node=from_node, tx_hex=tx.serialize().hex())
+        tx_hex = tx.serialize().hex()
+        txid = self._sendrawtransaction_local(from_node=from_node, tx=tx, tx_hex=tx_hex)
         return {
             "sent_vout": 1,
             "txid": txid,
             "wtxid": tx.getwtxid(),
-            "hex": tx.serialize().hex(),
+            "hex": tx_hex,
+            "tx": tx,
+        }
+
+    def send_to_many(self, *, from_node, outputs, fee=1000):
+        """
+        Create and send a tx with an output for each (scriptPubKey, amount)
+        pair in outputs, plus a change output to our internal address. A
+        fixed fee given in Satoshi is used, as in send_to.
+
+        The outputs are placed after the change output, in the given order;
+        their indexes are returned as "sent_vouts".
+        """
+        tx = self.create_self_transfer(fee_rate=0)["tx"]
+        total_amount = sum(amount for _, amount in outputs)
+        assert_greater_than_or_equal(tx.vout[0].nValue, total_amount + fee)
+        tx.vout[0].nValue -= (total_amount + fee)     # change output -> MiniWallet
+        tx.vout.extend(CTxOut(amount, scriptPubKey) for scriptPubKey, amount in outputs)
+        tx_hex = tx.serialize().hex()
+        txid = self._sendrawtransaction_local(from_node=from_node, tx=tx, tx_hex=tx_hex)
+        return {
+            "sent_vouts": list(range(1, len(outputs) + 1)),
+            "txid": txid,
+            "wtxid": tx.getwtxid(),
+            "hex": tx_hex,
             "tx": tx,
         }
 
@@ -373,6 +398,18 @@ class MiniWallet:
         self.scan_tx(from_node.decoderawtransaction(tx_hex))
         return txid
 
+    def _sendrawtransaction_local(self, *, from_node, tx, tx_hex):
+        """Send a tx built by this wallet and scan its outputs locally.
+
+        Equivalent to sendrawtransaction, but skips the decoderawtransaction
+        round-trip since the inputs were already marked as spent when the tx
+        was created."""
+        txid = from_node.sendrawtransaction(hexstring=tx_hex, maxfeerate=0)
+        for n, out in enumerate(tx.vout):
+            if out.scriptPubKey == self._scriptPubKey:
+                self._utxos.append(self._create_utxo(txid=txid, vout=n, value=Decimal(out.nValue) / COIN, height=0, coinbase=False, confirmations=0))
+        return txid
+
     def create_self_transfer_chain(self, *, chain_length, utxo_to_spend=None):
         """
         Create a "chain" of chain_length transactions. The nth transaction in